@@ -1,15 +1,28 @@
 import importlib.metadata
-import argparse
-import argcomplete
-import tempfile
-import subprocess
+import hashlib
+import mmap
 import os
-import textwrap
-import difflib
+import stat
+import shutil
 from pathlib import Path
 import time
 
 
+def _find_tmpfs_dir() -> str | None:
+    # RAM-backed temp dir for edit buffers on Linux; None falls back to
+    # the OS default temp dir (macOS, BSD, or a locked-down /dev/shm).
+    shm = "/dev/shm"
+    if os.path.isdir(shm) and os.access(shm, os.W_OK | os.X_OK):
+        return shm
+    return None
+
+
+_TMPFS_DIR = _find_tmpfs_dir()
+
+# Backup dirs already created (or found) by this process
+_known_dirs: set[str] = set()
+
+
 def get_version():
     try:
         return importlib.metadata.version("mirro")
@@ -17,24 +30,131 @@ def get_version():
         return "unknown"
 
 
+def _stat_or_none(path) -> os.stat_result | None:
+    try:
+        return os.lstat(path)
+    except FileNotFoundError:
+        return None
+
+
 def read_file(path: Path) -> str:
-    if not path.exists():
+    """
+    Read a text file, returning "" if it doesn't exist.
+    Invalid UTF-8 is kept as surrogates so write_file() restores it
+    byte for byte.
+    """
+    try:
+        return path.read_text(encoding="utf-8", errors="surrogateescape")
+    except FileNotFoundError:
         return ""
-    return path.read_text(encoding="utf-8", errors="replace")
 
 
 def write_file(path: Path, content: str):
-    path.write_text(content, encoding="utf-8")
+    path.write_text(content, encoding="utf-8", errors="surrogateescape")
+
+
+def read_bytes(path, st: os.stat_result | None = None) -> bytes:
+    """
+    Read a file's raw bytes, sizing the first read from a cached stat
+    result when one is given.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        size = (st if st is not None else os.fstat(fd)).st_size
+        data = os.read(fd, size) if size else b""
+        # Keep reading on short reads or files that under-report their size
+        while chunk := os.read(fd, 1 << 16):
+            data += chunk
+        return data
+    finally:
+        os.close(fd)
+
+
+def write_bytes(path, data: bytes):
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view) :]
+    finally:
+        os.close(fd)
+
+
+def _writev_all(fd: int, buffers: list[bytes]):
+    """
+    Gather-write buffers to fd with writev, without concatenating them,
+    retrying on short writes.
+    """
+    views = [memoryview(b) for b in buffers if b]
+    while views:
+        n = os.writev(fd, views)
+        while views and n >= len(views[0]):
+            n -= len(views.pop(0))
+        if views:
+            views[0] = views[0][n:]
+
+
+def _copy_fd(src_fd: int, dst_fd: int):
+    """
+    Copy src_fd to dst_fd from their current offsets until EOF, inside the
+    kernel where the platform allows it.
+    """
+    if hasattr(os, "copy_file_range"):  # Linux
+        try:
+            while os.copy_file_range(src_fd, dst_fd, 1 << 30):
+                pass
+            return
+        except OSError:
+            # Unsupported filesystem pair or old kernel; the offsets have
+            # advanced past whatever was copied, so finish in user space
+            pass
+    with open(src_fd, "rb", closefd=False) as fsrc, open(
+        dst_fd, "wb", closefd=False
+    ) as fdst:
+        shutil.copyfileobj(fsrc, fdst)
+
+
+def _fd_digest(fd: int, size: int) -> bytes:
+    # Hash through a read-only mapping: no user-space read buffer, and
+    # the kernel pages the file in as the hash walks it
+    if size == 0:
+        return hashlib.blake2b().digest()
+    with mmap.mmap(fd, size, access=mmap.ACCESS_READ) as mm:
+        return hashlib.blake2b(mm).digest()
+
+
+def _format_ts(tm: time.struct_time) -> tuple[str, str]:
+    """
+    Return the header timestamp and the compact filename stamp for tm,
+    formatted directly rather than through strftime.
+    """
+    date = f"{tm.tm_year:04d}-{tm.tm_mon:02d}-{tm.tm_mday:02d}"
+    clock = f"{tm.tm_hour:02d}:{tm.tm_min:02d}:{tm.tm_sec:02d}"
+    short = (
+        f"{tm.tm_year:04d}{tm.tm_mon:02d}{tm.tm_mday:02d}"
+        f"T{tm.tm_hour:02d}{tm.tm_min:02d}{tm.tm_sec:02d}"
+    )
+    return f"{date} {clock} UTC", short
 
 
 def backup_original(
-    original_path: Path, original_content: str, backup_dir: Path
+    original_path: str | Path,
+    original_content: str | bytes | None,
+    backup_dir: Path,
 ) -> Path:
-    backup_dir.mkdir(parents=True, exist_ok=True)
-    timestamp = time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime())
-    shortstamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+    """
+    Write a headed backup of the original into backup_dir. When
+    original_content is None the content is copied straight from
+    original_path without passing through Python.
+    """
+    d = str(backup_dir)
+    if d not in _known_dirs:
+        os.makedirs(d, exist_ok=True)
+        _known_dirs.add(d)
+
+    timestamp, shortstamp = _format_ts(time.gmtime())
 
-    backup_name = f"{original_path.name}.orig.{shortstamp}"
+    backup_name = f"{os.path.basename(original_path)}.orig.{shortstamp}"
     backup_path = backup_dir / backup_name
 
     header = (
@@ -46,37 +166,75 @@ def backup_original(
         "# ---------------------------------------------------\n\n"
     )
 
-    backup_path.write_text(header + original_content, encoding="utf-8")
+    header_bytes = header.encode("utf-8", "surrogateescape")
+
+    if isinstance(original_content, str):
+        original_content = original_content.encode("utf-8", "surrogateescape")
+
+    src_fd = None
+    if original_content is None:
+        src_fd = os.open(original_path, os.O_RDONLY)
+    try:
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+        try:
+            dst_fd = os.open(backup_path, flags, 0o644)
+        except FileNotFoundError:
+            # The cached dir was removed since (e.g. by a prune); recreate
+            # it and keep it cached
+            os.makedirs(d, exist_ok=True)
+            dst_fd = os.open(backup_path, flags, 0o644)
+        try:
+            if src_fd is None:
+                _writev_all(dst_fd, [header_bytes, original_content])
+            else:
+                _writev_all(dst_fd, [header_bytes])
+                _copy_fd(src_fd, dst_fd)
+        finally:
+            os.close(dst_fd)
+    finally:
+        if src_fd is not None:
+            os.close(src_fd)
 
     return backup_path
 
 
-def strip_mirro_header(text: str) -> str:
+# Every mirro header opens with these two lines and ends at the first
+# blank line; bytes twins let backups be stripped without decoding
+_HEADER_START = (
+    "# ---------------------------------------------------\n# mirro backup\n"
+)
+_HEADER_END = "\n\n"
+_HEADER_START_B = _HEADER_START.encode()
+_HEADER_END_B = _HEADER_END.encode()
+
+
+def strip_mirro_header(data: str | bytes) -> str | bytes:
     """
     Strip only mirro's backup header (if present).
     Never removes shebangs or anything else.
+    Accepts str or bytes and returns the same type.
     """
-    lines = text.splitlines(keepends=True)
+    if isinstance(data, bytes):
+        start, end = _HEADER_START_B, _HEADER_END_B
+    else:
+        start, end = _HEADER_START, _HEADER_END
 
-    # If there's no mirro header, return the text unchanged
-    if not lines or not lines[0].startswith(
-        "# ---------------------------------------------------"
-    ):
-        return text
+    # If there's no mirro header, return the data unchanged
+    if not data.startswith(start):
+        return data
 
-    # Otherwise skip all header lines until the first blank line
-    i = 0
-    while i < len(lines):
-        if lines[i].strip() == "":
-            i += 1  # skip the blank separator line
-            break
-        i += 1
+    # Otherwise drop everything up to and including the first blank line
+    i = data.find(end, len(start) - 1)
+    if i < 0:
+        return data
+    return data[i + len(end) :]
 
-    # 'i' now points to the first real line of the original file
-    return "".join(lines[i:])
 
+def _build_parser():
+    # Heavier stdlib modules are imported where they're first needed so
+    # quick exits (--version, --list, permission errors) skip them
+    import argparse
 
-def main():
     parser = argparse.ArgumentParser(
         description="Safely edit a file with automatic original backup if changed."
     )
@@ -84,8 +242,8 @@ def main():
     parser.add_argument(
         "--backup-dir",
         type=str,
-        default=str(Path.home() / ".local/share/mirro"),
-        help="Backup directory",
+        default=None,
+        help="Backup directory (default: ~/.local/share/mirro)",
     )
 
     parser.add_argument(
@@ -127,11 +285,102 @@ def main():
         help="Show which files in the current directory have 'revisions'",
     )
 
-    argcomplete.autocomplete(parser)
+    return parser
+
+
+def _unified_diff(backup_data: bytes, file_path: Path) -> list[str]:
+    """
+    Unified diff of backup_data against file_path, as lines without
+    newlines. Uses the system diff (C, O(ND)) when available, falling
+    back to difflib, which is pure Python and quadratic in the worst case.
+    """
+    name = file_path.name
+    backup = backup_data.decode("utf-8", errors="replace").splitlines()
+    original = file_path.read_text(
+        encoding="utf-8", errors="replace"
+    ).splitlines()
+
+    diff_bin = shutil.which("diff")
+
+    if diff_bin:
+        import subprocess
+        import tempfile
+
+        # Hand diff the same lines difflib sees: split by splitlines and
+        # rejoined with a final newline on every line, so a missing
+        # trailing newline counts the same on both paths. -a keeps
+        # NUL-containing files from being reported as "Binary files".
+        def write_lines(lines):
+            tf = tempfile.NamedTemporaryFile(
+                "w",
+                encoding="utf-8",
+                newline="",
+                prefix="mirro-",
+                dir=_TMPFS_DIR,
+            )
+            tf.writelines(line + "\n" for line in lines)
+            tf.flush()
+            return tf
+
+        with write_lines(backup) as a, write_lines(original) as b:
+            proc = subprocess.run(
+                [
+                    diff_bin,
+                    "-a",
+                    "-u",
+                    "-L",
+                    f"a/{name}",
+                    "-L",
+                    f"b/{name}",
+                    a.name,
+                    b.name,
+                ],
+                capture_output=True,
+                encoding="utf-8",
+                errors="replace",
+            )
+        # 0: identical, 1: differences; anything else is a diff failure
+        if proc.returncode in (0, 1):
+            return proc.stdout.splitlines()
+
+    import difflib
+
+    # Generate a clean diff (no trailing line noise)
+    return list(
+        difflib.unified_diff(
+            backup,
+            original,
+            fromfile=f"a/{name}",
+            tofile=f"b/{name}",
+            lineterm="",
+        )
+    )
+
+
+# Built on first use by main() and reused by later calls
+_PARSER = None
+
+
+def main():
+    global _PARSER
+    if _PARSER is None:
+        _PARSER = _build_parser()
+    parser = _PARSER
+
+    # argcomplete only acts when the shell sets _ARGCOMPLETE, and importing
+    # it pulls in subprocess/tempfile, so skip it on normal runs
+    if "_ARGCOMPLETE" in os.environ:
+        import argcomplete
+
+        argcomplete.autocomplete(parser)
 
     # Parse only options. Leave everything else untouched.
     args, positional = parser.parse_known_args()
 
+    # Resolved per call rather than baked into the cached parser
+    if args.backup_dir is None:
+        args.backup_dir = str(Path.home() / ".local/share/mirro")
+
     if args.diff:
         file_arg, backup_arg = args.diff
 
@@ -162,22 +411,9 @@ def main():
             )
             return 1
 
-        original = file_path.read_text(
-            encoding="utf-8", errors="replace"
-        ).splitlines()
-        backup_raw = backup_path.read_text(encoding="utf-8", errors="replace")
+        backup_stripped = strip_mirro_header(read_bytes(backup_path))
 
-        backup_stripped = strip_mirro_header(backup_raw)
-        backup = backup_stripped.splitlines()
-
-        # Generate a clean diff (no trailing line noise)
-        diff = difflib.unified_diff(
-            backup,
-            original,
-            fromfile=f"a/{file_path.name}",
-            tofile=f"b/{file_path.name}",
-            lineterm="",
-        )
+        diff = _unified_diff(backup_stripped, file_path)
 
         # Colors
         RED = "\033[31m"
@@ -204,14 +440,17 @@ def main():
     if args.list:
         import pwd, grp
 
-        backup_dir = Path(args.backup_dir).expanduser().resolve()
-        if not backup_dir.exists():
+        backup_dir = os.path.expanduser(args.backup_dir)
+
+        # DirEntry caches its stat, so each backup is stat'ed only once
+        try:
+            with os.scandir(backup_dir) as it:
+                backups = [(e.name, e.stat()) for e in it if e.is_file()]
+        except FileNotFoundError:
             print("No backups found.")
             return
 
-        backups = sorted(
-            backup_dir.iterdir(), key=os.path.getmtime, reverse=True
-        )
+        backups.sort(key=lambda b: b[1].st_mtime, reverse=True)
         if not backups:
             print("No backups found.")
             return
@@ -234,60 +473,58 @@ def main():
                 perms += char if bit else "-"
             return is_file + perms
 
-        for b in backups:
-            stat = b.stat()
-            mode = perms(stat.st_mode)
+        for name, st in backups:
+            mode = perms(st.st_mode)
 
             try:
-                owner = pwd.getpwuid(stat.st_uid).pw_name
+                owner = pwd.getpwuid(st.st_uid).pw_name
             except KeyError:
-                owner = str(stat.st_uid)
+                owner = str(st.st_uid)
 
             try:
-                group = grp.getgrgid(stat.st_gid).gr_name
+                group = grp.getgrgid(st.st_gid).gr_name
             except KeyError:
-                group = str(stat.st_gid)
+                group = str(st.st_gid)
 
             owner_group = f"{owner} {group}"
 
             mtime = time.strftime(
-                "%Y-%m-%d %H:%M:%S", time.gmtime(stat.st_mtime)
+                "%Y-%m-%d %H:%M:%S", time.gmtime(st.st_mtime)
             )
 
-            print(f"{mode:11} {owner_group:20} {mtime}  {b.name}")
+            print(f"{mode:11} {owner_group:20} {mtime}  {name}")
 
         return
 
     if args.status:
-        backup_dir = Path(args.backup_dir).expanduser().resolve()
-        cwd = Path.cwd()
+        backup_dir = os.path.expanduser(args.backup_dir)
+        cwd = os.getcwd()
 
-        if not backup_dir.exists():
+        # Build map: filename -> list of backups
+        backup_map = {}
+        try:
+            with os.scandir(backup_dir) as it:
+                for b in it:
+                    if ".orig." not in b.name:
+                        continue
+                    filename, _, _ = b.name.partition(".orig.")
+                    backup_map.setdefault(filename, []).append(b)
+        except FileNotFoundError:
             print(f"No mirro backups found in {cwd}.")
             return 0
 
-        # Build map: filename -> list of backups
-        backup_map = {}
-        for b in backup_dir.iterdir():
-            name = b.name
-            if ".orig." not in name:
-                continue
-            filename, _, _ = name.partition(".orig.")
-            backup_map.setdefault(filename, []).append(b)
-
-        # Find files in current dir that have backups
+        # Find files in current dir that have backups; only their
+        # backups ever get stat'ed
         entries = []
-        for file in cwd.iterdir():
-            if file.is_file() and file.name in backup_map:
+        with os.scandir(cwd) as it:
+            for file in it:
+                if file.name not in backup_map or not file.is_file():
+                    continue
                 backups = backup_map[file.name]
-                backups_sorted = sorted(
-                    backups, key=lambda x: x.stat().st_mtime, reverse=True
-                )
-                latest = backups_sorted[0]
+                latest = max(b.stat().st_mtime for b in backups)
 
                 latest_mtime = time.strftime(
-                    "%Y-%m-%d %H:%M:%S UTC",
-                    time.gmtime(latest.stat().st_mtime),
+                    "%Y-%m-%d %H:%M:%S UTC", time.gmtime(latest)
                 )
 
                 entries.append((file.name, len(backups), latest_mtime))
@@ -308,28 +545,26 @@ def main():
         backup_dir = Path(args.backup_dir).expanduser().resolve()
         target = Path(args.restore_last).expanduser().resolve()
 
-        if not backup_dir.exists():
-            print("No backup directory found.")
-            return 1
-
         # backup filenames look like: <name>.orig.<timestamp>
         prefix = f"{target.name}.orig."
 
-        backups = [
-            b for b in backup_dir.iterdir() if b.name.startswith(prefix)
-        ]
+        try:
+            with os.scandir(backup_dir) as it:
+                backups = [b for b in it if b.name.startswith(prefix)]
+        except FileNotFoundError:
+            print("No backup directory found.")
+            return 1
 
         if not backups:
             print(f"No history found for {target}")
             return 1
 
         # newest backup
-        last = max(backups, key=os.path.getmtime)
+        last = max(backups, key=lambda b: b.stat().st_mtime)
 
-        # read and strip header
-        raw = last.read_text(encoding="utf-8", errors="replace")
-        restored_text = strip_mirro_header(raw)
-        target.write_text(restored_text, encoding="utf-8")
+        # read and strip header; bytes keep the restore byte-exact
+        raw = read_bytes(last.path)
+        write_bytes(target, strip_mirro_header(raw))
 
         print(f"Restored {target} from backup {last.name}")
         return
@@ -362,6 +597,8 @@ def main():
                 if prune_days < 1:
                     raise ValueError
             except ValueError:
+                import textwrap
+
                 msg = f"""
                     Invalid value for --prune-backups: {mode}
 
@@ -372,30 +609,32 @@ def main():
                 print(textwrap.dedent(msg))
                 return 1
 
-        backup_dir = Path(args.backup_dir).expanduser().resolve()
+        backup_dir = os.path.expanduser(args.backup_dir)
 
-        if not backup_dir.exists():
+        try:
+            with os.scandir(backup_dir) as it:
+                backups = [b for b in it if b.is_file()]
+        except FileNotFoundError:
             print("No backup directory found.")
             return 0
 
         # prune EVERYTHING
         if prune_days is None:
-            removed = []
-            for b in backup_dir.iterdir():
-                if b.is_file():
-                    removed.append(b)
-                    b.unlink()
-            print(f"Removed ALL backups ({len(removed)} file(s)).")
+            # Unlink just the files: the dir itself (its owner, mode,
+            # ACLs, or a mount point) and any subdirectories stay put
+            for b in backups:
+                os.unlink(b.path)
+            print(f"Removed ALL backups ({len(backups)} file(s)).")
             return 0
 
         # prune by age
         cutoff = time.time() - (prune_days * 86400)
         removed = []
 
-        for b in backup_dir.iterdir():
-            if b.is_file() and b.stat().st_mtime < cutoff:
+        for b in backups:
+            if b.stat().st_mtime < cutoff:
                 removed.append(b)
-                b.unlink()
+                os.unlink(b.path)
 
         if removed:
             print(
@@ -427,53 +666,107 @@ def main():
         parser.error("the following arguments are required: file")
 
     editor = os.environ.get("EDITOR", "nano")
-    editor_cmd = editor.split()
-
-    target = Path(file_arg).expanduser().resolve()
-    backup_dir = Path(args.backup_dir).expanduser().resolve()
+    # Plain "nano"/"vim" needs no tokenising
+    if " " in editor or "\t" in editor:
+        editor_cmd = editor.split()
+    else:
+        editor_cmd = [editor]
+
+    # Work on plain strings; resolve() lstats every path component, so
+    # only resolve when the path could actually need it
+    target_str = os.path.expanduser(file_arg)
+    st = _stat_or_none(target_str)
+    if (
+        st is not None
+        and not stat.S_ISLNK(st.st_mode)
+        and os.pardir not in target_str.split(os.sep)
+    ):
+        target_str = os.path.abspath(target_str)
+    else:
+        target_str = os.path.realpath(target_str)
+        if st is not None:
+            st = _stat_or_none(target_str)
 
     # Permission checks
-    parent = target.parent
-    if target.exists() and not os.access(target, os.W_OK):
-        print(f"Need elevated privileges to open {target}")
+    if st is not None and not os.access(target_str, os.W_OK):
+        print(f"Need elevated privileges to open {target_str}")
         return 1
-    if not target.exists() and not os.access(parent, os.W_OK):
-        print(f"Need elevated privileges to create {target}")
+    if st is None and not os.access(os.path.dirname(target_str), os.W_OK):
+        print(f"Need elevated privileges to create {target_str}")
         return 1
 
-    # Read original or prepopulate for new file
-    if target.exists():
-        original_content = read_file(target)
-    else:
-        original_content = "This is a new file created with 'mirro'!\n"
-
-    # Temp file for editing
-    with tempfile.NamedTemporaryFile(
-        delete=False, prefix="mirro-", suffix=target.suffix
-    ) as tf:
-        temp_path = Path(tf.name)
-
-    write_file(temp_path, original_content)
-
-    if "nano" in editor_cmd[0]:
-        subprocess.call(editor_cmd + editor_extra + [str(temp_path)])
-    else:
-        subprocess.call(editor_cmd + [str(temp_path)] + editor_extra)
-
-    # Read edited
-    edited_content = read_file(temp_path)
-    temp_path.unlink(missing_ok=True)
-
-    if edited_content == original_content:
-        print("file hasn't changed")
-        return
+    # New files are prepopulated; existing ones are copied into the temp
+    # file in the kernel and never read into Python
+    if st is None:
+        new_content = b"This is a new file created with 'mirro'!\n"
+
+    import subprocess
+    import tempfile
+
+    # Temp file for editing. mkstemp hands back a bare fd, without
+    # NamedTemporaryFile's file object and finalizer; it's unlinked
+    # explicitly below.
+    fd, temp_str = tempfile.mkstemp(
+        prefix="mirro-",
+        suffix=os.path.splitext(target_str)[1],
+        dir=_TMPFS_DIR,
+    )
+    try:
+        # Fingerprint the pre-edit buffer so the edited one can be
+        # compared without reading it back into memory
+        try:
+            if st is None:
+                _writev_all(fd, [new_content])
+                orig_size = len(new_content)
+                orig_digest = hashlib.blake2b(new_content).digest()
+            else:
+                src_fd = os.open(target_str, os.O_RDONLY)
+                try:
+                    _copy_fd(src_fd, fd)
+                finally:
+                    os.close(src_fd)
+                # Size what was actually copied: the target may have changed
+                # since the stat, and procfs/sysfs files report st_size 0
+                orig_size = os.fstat(fd).st_size
+                orig_digest = _fd_digest(fd, orig_size)
+        finally:
+            os.close(fd)
+
+        # subprocess already launches via vfork/posix_spawn and closes
+        # inherited fds with close_range where the platform supports it
+        if "nano" in editor_cmd[0]:
+            subprocess.call([*editor_cmd, *editor_extra, temp_str])
+        else:
+            subprocess.call([*editor_cmd, temp_str, *editor_extra])
+
+        # A size change means an edit and needs no content read at all;
+        # only same-sized buffers get hashed
+        with open(temp_str, "rb") as f:
+            edited_size = os.fstat(f.fileno()).st_size
+            changed = (
+                edited_size != orig_size
+                or _fd_digest(f.fileno(), edited_size) != orig_digest
+            )
 
-    # Changed: backup original
-    backup_path = backup_original(target, original_content, backup_dir)
-    print(f"file changed; original backed up at {backup_path}")
+        if not changed:
+            print("file hasn't changed")
+            return
 
-    # Overwrite target
-    target.write_text(edited_content, encoding="utf-8")
+        # Changed: backup original
+        backup_dir = Path(os.path.abspath(os.path.expanduser(args.backup_dir)))
+        backup_path = backup_original(
+            target_str, new_content if st is None else None, backup_dir
+        )
+        print(f"file changed; original backed up at {backup_path}")
+
+        # Overwrite target in place (keeps its inode, mode and owner);
+        # copyfile uses sendfile, so the edit never passes through Python
+        shutil.copyfile(temp_str, target_str)
+    finally:
+        try:
+            os.unlink(temp_str)
+        except FileNotFoundError:
+            pass
 
 
 if __name__ == "__main__":
@@ -1,4 +1,5 @@
 import os
+import shutil
 import time
 import subprocess
 from pathlib import Path
@@ -42,12 +43,79 @@ def test_read_file_missing(tmp_path):
     assert mirro.read_file(tmp_path / "nope.txt") == ""
 
 
+def test_stat_or_none(tmp_path):
+    p = tmp_path / "x.txt"
+    p.write_text("hello\n", encoding="utf-8")
+    assert mirro._stat_or_none(p).st_size == 6
+    assert mirro._stat_or_none(tmp_path / "nope.txt") is None
+
+
 def test_write_file(tmp_path):
     p = tmp_path / "y.txt"
     mirro.write_file(p, "data")
     assert p.read_text(encoding="utf-8") == "data"
 
 
+def test_read_write_file_round_trips_invalid_utf8(tmp_path):
+    src = tmp_path / "bad.txt"
+    dst = tmp_path / "copy.txt"
+    src.write_bytes(b"ok \xff\xfe end\n")
+    mirro.write_file(dst, mirro.read_file(src))
+    assert dst.read_bytes() == b"ok \xff\xfe end\n"
+
+    backup_path = mirro.backup_original(
+        src, mirro.read_file(src), tmp_path / "backups"
+    )
+    assert backup_path.read_bytes().endswith(b"\n\nok \xff\xfe end\n")
+
+
+def test_read_write_bytes(tmp_path):
+    p = tmp_path / "b.bin"
+    data = b"caf\xe9 \xff\n"  # not valid UTF-8
+    mirro.write_bytes(p, data)
+    assert p.read_bytes() == data
+    assert mirro.read_bytes(p) == data
+    assert mirro.read_bytes(p, os.stat(p)) == data
+
+
+def test_writev_all_short_writes(tmp_path, monkeypatch):
+    real_writev = os.writev
+
+    # Write at most 3 bytes per call to exercise the retry path
+    def short_writev(fd, bufs):
+        return real_writev(fd, [b"".join(bufs)[:3]])
+
+    monkeypatch.setattr(os, "writev", short_writev)
+
+    p = tmp_path / "v.bin"
+    fd = os.open(p, os.O_WRONLY | os.O_CREAT)
+    try:
+        mirro._writev_all(fd, [b"head\n", b"", b"body\n"])
+    finally:
+        os.close(fd)
+    assert p.read_bytes() == b"head\nbody\n"
+
+
+def digest(path):
+    with open(path, "rb") as f:
+        return mirro._fd_digest(f.fileno(), os.fstat(f.fileno()).st_size)
+
+
+def test_fd_digest(tmp_path):
+    a = tmp_path / "a.txt"
+    b = tmp_path / "b.txt"
+    a.write_bytes(b"same\n")
+    b.write_bytes(b"same\n")
+    assert digest(a) == digest(b)
+
+    b.write_bytes(b"diff\n")
+    assert digest(a) != digest(b)
+
+    empty = tmp_path / "empty.txt"
+    empty.write_bytes(b"")
+    assert digest(empty) == mirro.hashlib.blake2b().digest()
+
+
 # ============================================================
 # strip_mirro_header
 # ============================================================
@@ -69,6 +137,18 @@ def test_strip_header_removes_header():
     assert "mirro backup" not in out
 
 
+def test_strip_header_bytes():
+    data = (
+        b"# ---------------------------------------------------\n"
+        b"# mirro backup\n"
+        b"# Original file: x\n"
+        b"\n"
+        b"raw \xff\n"
+    )
+    assert mirro.strip_mirro_header(data) == b"raw \xff\n"
+    assert mirro.strip_mirro_header(b"plain\n") == b"plain\n"
+
+
 def test_strip_header_preserves_shebang():
     text = "#!/usr/bin/env python3\nprint('hi')\n"
     out = mirro.strip_mirro_header(text)
@@ -114,6 +194,40 @@ def test_backup_original(tmp_path, monkeypatch):
     assert "mirro backup" in text
     assert "Original file" in text
     assert "ABC" in text
+    assert "# Timestamp: 2023-01-02 03:04:05 UTC" in text
+    assert backup_path.name == "a.txt.orig.20230102T030405"
+
+
+def test_backup_original_copies_from_file(tmp_path):
+    original_path = tmp_path / "a.txt"
+    original_path.write_bytes(b"raw \xff bytes\n")
+
+    backup_path = mirro.backup_original(
+        original_path, None, tmp_path / "backups"
+    )
+
+    data = backup_path.read_bytes()
+    assert data.startswith(b"# ----")
+    assert data.endswith(b"\n\nraw \xff bytes\n")
+
+
+def test_backup_original_recreates_removed_dir(tmp_path):
+    backup_dir = tmp_path / "backups"
+    mirro.backup_original(tmp_path / "a.txt", "one", backup_dir)
+
+    # Cached as existing, then removed behind the cache's back
+    shutil.rmtree(backup_dir)
+
+    backup_path = mirro.backup_original(tmp_path / "a.txt", "two", backup_dir)
+    assert backup_path.read_text().endswith("two")
+
+
+def test_format_ts():
+    tm = time.struct_time((2023, 1, 2, 3, 4, 5, 0, 0, 0))
+    assert mirro._format_ts(tm) == (
+        "2023-01-02 03:04:05 UTC",
+        "20230102T030405",
+    )
 
 
 # ============================================================
@@ -261,6 +375,84 @@ def test_main_new_file_changed(tmp_path, monkeypatch, capsys):
     assert new.read_text() == "XYZ\n"
 
 
+# ============================================================
+# main: target path resolution
+# ============================================================
+
+
+def backup_files(backup_dir):
+    return [p.name for p in backup_dir.iterdir()]
+
+
+def test_main_edit_through_symlink(tmp_path, monkeypatch, capsys):
+    real = tmp_path / "real.txt"
+    link = tmp_path / "link.txt"
+    link.symlink_to(real)
+    bk = tmp_path / "bk"
+
+    result, out = simulate_main(
+        monkeypatch,
+        capsys,
+        args=["--backup-dir", str(bk), str(link)],
+        start_content="old\n",
+        edited_content="new\n",
+    )
+
+    assert "file changed; original backed up at" in out
+    assert link.is_symlink()
+    assert real.read_text() == "new\n"
+
+    (name,) = backup_files(bk)
+    assert name.startswith("real.txt.orig.")
+    assert f"# Original file: {real}\n" in (bk / name).read_text()
+
+
+def test_main_edit_dotdot_through_symlinked_dir(tmp_path, monkeypatch, capsys):
+    # sub -> other/deeper, so sub/../f.txt is other/f.txt, not ./f.txt
+    (tmp_path / "other" / "deeper").mkdir(parents=True)
+    (tmp_path / "sub").symlink_to(tmp_path / "other" / "deeper")
+    real = tmp_path / "other" / "f.txt"
+    bk = tmp_path / "bk"
+
+    result, out = simulate_main(
+        monkeypatch,
+        capsys,
+        args=["--backup-dir", str(bk), str(tmp_path / "sub" / ".." / "f.txt")],
+        start_content="old\n",
+        edited_content="new\n",
+    )
+
+    assert "file changed; original backed up at" in out
+    assert real.read_text() == "new\n"
+    assert not (tmp_path / "f.txt").exists()
+
+    (name,) = backup_files(bk)
+    assert f"# Original file: {real}\n" in (bk / name).read_text()
+
+
+def test_main_create_through_dangling_symlink(tmp_path, monkeypatch, capsys):
+    missing = tmp_path / "missing.txt"
+    link = tmp_path / "link.txt"
+    link.symlink_to(missing)
+    bk = tmp_path / "bk"
+
+    result, out = simulate_main(
+        monkeypatch,
+        capsys,
+        args=["--backup-dir", str(bk), str(link)],
+        start_content=None,
+        edited_content="XYZ\n",
+        file_exists=False,
+    )
+
+    assert "file changed; original backed up at" in out
+    assert link.is_symlink()
+    assert missing.read_text() == "XYZ\n"
+
+    (name,) = backup_files(bk)
+    assert name.startswith("missing.txt.orig.")
+
+
 # ============================================================
 # Permission denied branches
 # ============================================================
@@ -285,7 +477,7 @@ def test_main_permission_denied_create(tmp_path, monkeypatch, capsys):
     new.parent.mkdir(parents=True)
 
     def fake_access(path, mode):
-        return False if path == new.parent else True
+        return False if os.fspath(path) == str(new.parent) else True
 
     monkeypatch.setattr(os, "access", fake_access)
     monkeypatch.setenv("EDITOR", "nano")
@@ -435,6 +627,76 @@ def test_prune_all(tmp_path, capsys):
     assert not any(d.iterdir())
 
 
+def test_prune_all_keeps_dir_mode(tmp_path, capsys):
+    d = tmp_path / "bk"
+    d.mkdir()
+    os.chmod(d, 0o700)
+    (d / "a").write_text("x")
+
+    with patch(
+        "sys.argv", ["mirro", "--prune-backups=all", "--backup-dir", str(d)]
+    ):
+        mirro.main()
+
+    assert "Removed ALL backups (1 file(s))" in capsys.readouterr().out
+    assert not any(d.iterdir())
+    assert d.stat().st_mode & 0o777 == 0o700
+
+
+def test_prune_all_keeps_dir_in_place(tmp_path, monkeypatch, capsys):
+    d = tmp_path / "bk"
+    d.mkdir()
+    (d / "a").write_text("x")
+    ino = d.stat().st_ino
+
+    # A mount point or a read-only parent can't have the dir removed
+    def refuse(*args, **kwargs):
+        raise OSError(16, "Device or resource busy")
+
+    monkeypatch.setattr(os, "rmdir", refuse)
+
+    with patch(
+        "sys.argv", ["mirro", "--prune-backups=all", "--backup-dir", str(d)]
+    ):
+        mirro.main()
+
+    assert "Removed ALL backups (1 file(s))" in capsys.readouterr().out
+    assert not any(d.iterdir())
+    assert d.stat().st_ino == ino
+
+
+@pytest.mark.skipif(os.geteuid() != 0, reason="chown needs root")
+def test_prune_all_keeps_dir_owner(tmp_path, capsys):
+    d = tmp_path / "bk"
+    d.mkdir()
+    (d / "a").write_text("x")
+    os.chown(d, 12345, 12345)
+
+    with patch(
+        "sys.argv", ["mirro", "--prune-backups=all", "--backup-dir", str(d)]
+    ):
+        mirro.main()
+
+    assert "Removed ALL backups (1 file(s))" in capsys.readouterr().out
+    assert (d.stat().st_uid, d.stat().st_gid) == (12345, 12345)
+
+
+def test_prune_all_leaves_subdirs(tmp_path, capsys):
+    d = tmp_path / "bk"
+    (d / "sub").mkdir(parents=True)
+    (d / "sub" / "keep").write_text("k")
+    (d / "a").write_text("x")
+
+    with patch(
+        "sys.argv", ["mirro", "--prune-backups=all", "--backup-dir", str(d)]
+    ):
+        mirro.main()
+
+    assert "Removed ALL backups (1 file(s))" in capsys.readouterr().out
+    assert not (d / "a").exists()
+    assert (d / "sub" / "keep").exists()
+
+
 def test_prune_numeric(tmp_path, capsys):
     d = tmp_path / "bk"
     d.mkdir()
@@ -544,6 +806,48 @@ def test_diff_basic(tmp_path, capsys):
     assert "+line2" in out
 
 
+@pytest.mark.skipif(
+    shutil.which("diff") is None, reason="no system diff binary"
+)
+def test_unified_diff_system_diff_matches_fallback(tmp_path, monkeypatch):
+    file = tmp_path / "t.txt"
+    cases = [
+        # (file content, backup content)
+        (b"line1\nline2", b"line1\nold"),  # no trailing newlines
+        (b"a\nb", b"a\nb\n"),  # only the trailing newline differs
+        (b"a\x00\nline2\n", b"a\x00\nold\n"),  # NUL bytes
+    ]
+
+    for content, backup in cases:
+        file.write_bytes(content)
+
+        with monkeypatch.context() as m:
+            system = mirro._unified_diff(backup, file)
+            m.setattr(mirro.shutil, "which", lambda _: None)
+            fallback = mirro._unified_diff(backup, file)
+
+        assert system == fallback
+        assert not any(line.startswith("Binary files") for line in system)
+
+    file.write_bytes(b"a\x00\nline2\n")
+    lines = mirro._unified_diff(b"a\x00\nold\n", file)
+    assert "-old" in lines
+    assert "+line2" in lines
+
+
+def test_unified_diff_difflib_fallback(tmp_path, monkeypatch):
+    file = tmp_path / "t.txt"
+    file.write_text("line1\nline2\n")
+
+    monkeypatch.setattr(mirro.shutil, "which", lambda _: None)
+    lines = mirro._unified_diff(b"line1\nold\n", file)
+
+    assert "--- a/t.txt" in lines
+    assert "+++ b/t.txt" in lines
+    assert "-old" in lines
+    assert "+line2" in lines
+
+
 def test_diff_wrong_backup_name_rejected(tmp_path, capsys):
     d = tmp_path / "bk"
     d.mkdir()